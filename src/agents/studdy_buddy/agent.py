@@ -1,21 +1,74 @@
+import json
 import os
-import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 import yaml
 from google.adk import Agent
 from google.adk.tools import google_search
 
+from .auto_tool_loader import cached_import, tool_module_path, write_text_atomic
+
+
+# Use the libyaml-backed loader when available
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Built-in ADK tools that can be referenced by name from the config
+_BUILTIN_TOOLS: dict = {
+    'google_search': google_search,
+}
+
+# Keys read from the 'agent' section of the config
+_AGENT_KEYS = ('name', 'description', 'model', 'prompt_file')
+
+# The most recently built agent per config path, stored with the config
+# mtime, prompt file and prompt mtime it was built from; edits to either file
+# replace the entry
+_AGENT_CACHE: dict = {}
+_AGENT_CACHE_LOCK = threading.Lock()
+
 
 def load_agent_config(config_path: str) -> dict:
     """Load agent configuration from YAML file."""
+    config_path = Path(config_path)
+    
+    # Prefer the pre-parsed JSON copy while it is at least as new as the YAML
+    json_path = config_path.with_suffix('.json')
+    try:
+        if json_path.stat().st_mtime_ns >= config_path.stat().st_mtime_ns:
+            return json.loads(json_path.read_bytes())
+    except (OSError, ValueError):
+        pass
+    
     with open(config_path, 'r', encoding='utf-8') as f:
-        return yaml.safe_load(f)
+        config = yaml.load(f, Loader=_YAML_LOADER)
+    
+    # Refresh the JSON copy atomically for the next load, but only when JSON
+    # holds the config losslessly (no dates, non-string keys, ...)
+    try:
+        dumped = json.dumps(config)
+        if json.loads(dumped) == config:
+            write_text_atomic(json_path, dumped)
+    except (TypeError, ValueError):
+        pass
+    except OSError as e:
+        print(f"Warning: Failed to write config cache {json_path}: {e}")
+    
+    return config
 
 
 def load_prompt(prompt_path: str) -> str:
     """Load prompt content from markdown file."""
-    with open(prompt_path, 'r', encoding='utf-8') as f:
-        return f.read().strip()
+    # Only re-read the file when its modification time changes
+    mtime_ns = os.stat(prompt_path).st_mtime_ns
+    return _load_prompt_cached(str(prompt_path), mtime_ns)
+
+
+@lru_cache(maxsize=32)
+def _load_prompt_cached(prompt_path: str, mtime_ns: int) -> str:
+    """Read and strip a prompt file; cached per (path, mtime)."""
+    return Path(prompt_path).read_text(encoding='utf-8').strip()
 
 
 def load_tools_from_config(config: dict, agent_dir: Path) -> list:
@@ -26,34 +79,28 @@ def load_tools_from_config(config: dict, agent_dir: Path) -> list:
         return tools
     
     for tool_config in config['tools']:
-        try:
-            # Check if it's a built-in tool
-            if 'builtin' in tool_config:
-                builtin_name = tool_config['builtin']
-                if builtin_name == 'google_search':
-                    tools.append(google_search)
-                else:
-                    print(f"Warning: Unknown built-in tool: {builtin_name}")
-            
-            # Handle custom tools with module and class
-            elif 'module' in tool_config and 'class' in tool_config:
-                # Import the module dynamically
-                module_name = tool_config['module']
-                module_path = f"{agent_dir.name}.{module_name}"
-                module = importlib.import_module(module_path, package=f"src.agents")
-                
-                # Get the tool class from the module and instantiate it
-                class_name = tool_config['class']
-                tool_class = getattr(module, class_name)
-                tool_instance = tool_class()
-                
-                tools.append(tool_instance)
-            
+        # Check if it's a built-in tool
+        if 'builtin' in tool_config:
+            builtin_name = tool_config['builtin']
+            builtin_tool = _BUILTIN_TOOLS.get(builtin_name)
+            if builtin_tool is None:
+                print(f"Warning: Unknown built-in tool: {builtin_name}")
             else:
-                print(f"Warning: Tool config missing required fields: {tool_config}")
-                
-        except Exception as e:
-            print(f"Warning: Failed to load tool {tool_config.get('name', 'unknown')}: {e}")
+                tools.append(builtin_tool)
+        
+        # Handle custom tools with module and class
+        elif 'module' in tool_config and 'class' in tool_config:
+            module_path = tool_module_path(agent_dir, tool_config['module'])
+            class_name = tool_config['class']
+            try:
+                # Resolve the tool class from its module and instantiate it
+                tool_class = cached_import(module_path, class_name)
+                tools.append(tool_class())
+            except (ImportError, AttributeError) as e:
+                print(f"Warning: Failed to load tool {tool_config.get('name', 'unknown')}: {e}")
+        
+        else:
+            print(f"Warning: Tool config missing required fields: {tool_config}")
     
     return tools
 
@@ -63,28 +110,87 @@ def create_study_buddy_agent() -> Agent:
     # Get current directory
     current_dir = Path(__file__).parent
     
-    # Load configuration
+    # Reuse the agent built from unchanged configuration and prompt files
     config_path = current_dir / 'agent_config.yml'
-    config = load_agent_config(config_path)
+    config_mtime_ns = os.stat(config_path).st_mtime_ns
+    with _AGENT_CACHE_LOCK:
+        cached = _AGENT_CACHE.get(str(config_path))
+        if cached is not None:
+            cached_config_mtime_ns, prompt_path, prompt_mtime_ns, agent = cached
+            if (cached_config_mtime_ns == config_mtime_ns
+                    and os.stat(prompt_path).st_mtime_ns == prompt_mtime_ns):
+                return agent
+        
+        agent, prompt_path = _build_study_buddy_agent(current_dir, config_path)
+        _AGENT_CACHE[str(config_path)] = (
+            config_mtime_ns, prompt_path, os.stat(prompt_path).st_mtime_ns, agent
+        )
+    
+    return agent
+
+
+def _load_frozen_agent(current_dir: Path, config_path: Path):
+    """
+    Return the module generated by codegen.py if it matches the files on disk.
+    It is imported here, not at module level, so importing this module stays
+    cheap; a missing, stale or malformed module gives None.
+    """
+    try:
+        from . import _frozen_agent
+        prompt_path = current_dir / _frozen_agent.PROMPT_FILE
+        is_current = (
+            os.stat(config_path).st_mtime_ns == _frozen_agent.CONFIG_MTIME_NS
+            and os.stat(prompt_path).st_mtime_ns == _frozen_agent.PROMPT_MTIME_NS
+            and callable(_frozen_agent.build)
+        )
+    except (ImportError, FileNotFoundError):
+        return None
+    except (SyntaxError, AttributeError, TypeError) as e:
+        print(f"Warning: Ignoring invalid generated agent module: {e}")
+        return None
     
-    # Load prompt
-    prompt_path = current_dir / config['agent']['prompt_file']
-    instruction = load_prompt(prompt_path)
+    return _frozen_agent if is_current else None
+
+
+def _build_study_buddy_agent(current_dir: Path, config_path: Path) -> tuple:
+    """Build the Study Buddy agent; returns (agent, prompt file path)."""
+    # Use the module generated by codegen.py while it is up to date
+    frozen_agent = _load_frozen_agent(current_dir, config_path)
+    if frozen_agent is not None:
+        return frozen_agent.build(), current_dir / frozen_agent.PROMPT_FILE
+    
+    # Load configuration
+    config = load_agent_config(config_path)
     
-    # Load tools from configuration
-    tools = load_tools_from_config(config, current_dir)
+    # Read the prompt in the background while tools are imported; the prompt
+    # path comes from the config, so the config itself is parsed up front
+    agent_config = config['agent']
+    name, description, model, prompt_file = (agent_config[key] for key in _AGENT_KEYS)
+    prompt_path = current_dir / prompt_file
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        prompt_future = executor.submit(load_prompt, prompt_path)
+        
+        # Load tools from configuration
+        tools = load_tools_from_config(config, current_dir)
+        
+        instruction = prompt_future.result()
     
     # Create agent with loaded configuration and tools
     agent = Agent(
-        name=config['agent']['name'],
-        description=config['agent']['description'],
-        model=config['agent']['model'],
+        name=name,
+        description=description,
+        model=model,
         instruction=instruction,
         tools=tools
     )
     
-    return agent
+    return agent, prompt_path
 
 
-# Create the agent instance
-root_agent = create_study_buddy_agent()
\ No newline at end of file
+def __getattr__(name: str):
+    """Create the root agent lazily on first access."""
+    if name == 'root_agent':
+        global root_agent
+        root_agent = create_study_buddy_agent()
+        return root_agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
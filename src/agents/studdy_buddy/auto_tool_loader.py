@@ -1,52 +1,213 @@
 import os
 import importlib
 import importlib.util
-import inspect
+import json
+import sys
+import tempfile
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
+from types import FunctionType
+from typing import List, Dict, Any, Tuple
 
 
-def auto_discover_tools(tools_dir: Path) -> List[Dict[str, Any]]:
-    """
-    Automatically discover and load tools from the tools directory.
+# Package that contains the agent packages ("src.agents" when imported from
+# the repository root, empty when the agents directory itself is on sys.path)
+_AGENTS_PACKAGE = (__package__ or "").rpartition('.')[0]
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """Replace a file's contents atomically via a unique temp file beside it."""
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def tool_module_path(agent_dir: Path, module_name: str) -> str:
+    """Build the absolute dotted name of a tool module inside an agent package."""
+    if _AGENTS_PACKAGE:
+        return f"{_AGENTS_PACKAGE}.{agent_dir.name}.{module_name}"
+    return f"{agent_dir.name}.{module_name}"
+
+
+@lru_cache(maxsize=None)
+def cached_import(module_path: str, attr: str) -> Any:
+    """Import a module by absolute name and return one of its attributes, memoizing the pair."""
+    module = sys.modules.get(module_path)
+    if module is None:
+        module = importlib.import_module(module_path)
+    return getattr(module, attr)
+
+
+# Cached result of scanning the tools directory
+TOOL_MANIFEST_NAME = ".tools_manifest.json"
+
+# Functions starting with these names are auto-registered as tools
+_TOOL_PREFIXES = ('calculate', 'convert', 'get_', 'solve_')
+
+# Fields a configured (non auto-discovered) tool entry must define
+_CONFIGURED_TOOL_FIELDS = ('name', 'description', 'module', 'function')
+
+# Tool modules executed from file, keyed by file path
+_TOOL_MODULES: Dict[str, Any] = {}
+
+# Tools directory that belongs to this agent package
+_PACKAGE_TOOLS_DIR = Path(__file__).resolve().parent / "tools"
+
+
+def _load_tool_module(py_file: str):
+    """Execute a tool module from its file path once and reuse the result."""
+    module = _TOOL_MODULES.get(py_file)
+    if module is not None:
+        return module
     
-    This function scans the tools directory for Python files and attempts to
-    automatically register functions as tools based on naming conventions.
+    # Modules in this package's own tools directory go through the regular
+    # import machinery, so one already imported elsewhere is not re-executed
+    py_path = Path(py_file)
+    if __package__ and py_path.resolve().parent == _PACKAGE_TOOLS_DIR:
+        full_name = f"{__package__}.tools.{py_path.stem}"
+        module = sys.modules.get(full_name)
+        if module is None:
+            module = importlib.import_module(full_name)
+    else:
+        spec = importlib.util.spec_from_file_location(py_path.stem, py_file)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    
+    _TOOL_MODULES[py_file] = module
+    return module
+
+
+def _scan_tools(tools_dir: Path) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Import every tool module and collect the functions exposed as tools.
+    Returns the tools and the names of modules that failed to load.
     """
     tools = []
-    
-    if not tools_dir.exists():
-        return tools
+    failed = []
     
     # Get all Python files in the tools directory
-    for py_file in tools_dir.glob("*.py"):
-        if py_file.name == "__init__.py":
-            continue
-            
-        module_name = py_file.stem
+    with os.scandir(tools_dir) as entries:
+        py_files = [
+            entry for entry in entries
+            if entry.name.endswith('.py') and entry.name != "__init__.py"
+        ]
+    
+    for entry in py_files:
+        module_name = entry.name[:-3]
         
         try:
             # Import the module dynamically
-            spec = importlib.util.spec_from_file_location(module_name, py_file)
-            module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(module)
+            module = _load_tool_module(entry.path)
             
-            # Look for functions that should be exposed as tools
-            for name, obj in inspect.getmembers(module):
-                if inspect.isfunction(obj) and not name.startswith('_'):
-                    # Check if function has proper docstring and is marked for tool usage
-                    if hasattr(obj, '__doc__') and obj.__doc__:
-                        # Functions starting with tool-specific names are auto-registered
-                        if any(name.startswith(prefix) for prefix in ['calculate', 'convert', 'get_', 'solve_']):
-                            tool = {
-                                "name": name,
-                                "description": obj.__doc__.strip().split('\n')[0],  # First line of docstring
-                                "function": obj
-                            }
-                            tools.append(tool)
+            # Look for functions defined in this module that should be exposed as tools
+            for name, obj in module.__dict__.items():
+                if name.startswith('_') or type(obj) is not FunctionType:
+                    continue
+                if obj.__module__ != module.__name__:
+                    continue
+                # Check if function has proper docstring and is marked for tool usage
+                if obj.__doc__ and name.startswith(_TOOL_PREFIXES):
+                    tool = {
+                        "name": name,
+                        "module": module_name,
+                        "description": obj.__doc__.strip().partition('\n')[0],  # First line of docstring
+                        "function": obj
+                    }
+                    tools.append(tool)
                             
-        except Exception as e:
+        except (ImportError, SyntaxError, AttributeError) as e:
             print(f"Warning: Failed to load tools from {module_name}: {e}")
+            failed.append(module_name)
+    
+    return tools, failed
+
+
+def _module_mtimes(tools_dir: Path) -> Dict[str, int]:
+    """Map each tool module name to its file's modification time."""
+    with os.scandir(tools_dir) as entries:
+        return {
+            entry.name[:-3]: entry.stat().st_mtime_ns
+            for entry in entries
+            if entry.name.endswith('.py') and entry.name != "__init__.py"
+        }
+
+
+def _build_manifest(tools_dir: Path, modules: Dict[str, int]) -> List[Dict[str, Any]]:
+    """Scan the tools directory and record the discovered tools in a manifest."""
+    tools, failed = _scan_tools(tools_dir)
+    
+    # A module that failed to load would be missing from the manifest for good,
+    # so only record complete scans and rescan until the failure is fixed
+    if failed:
+        return tools
+    
+    manifest = {
+        "modules": modules,
+        "tools": [
+            {
+                "name": tool["name"],
+                "module": tool["module"],
+                "qualname": tool["function"].__qualname__,
+                "doc_first_line": tool["description"],
+            }
+            for tool in tools
+        ],
+    }
+    
+    # Write atomically; a read-only tools directory just skips the manifest
+    manifest_path = tools_dir / TOOL_MANIFEST_NAME
+    try:
+        write_text_atomic(manifest_path, json.dumps(manifest, indent=2))
+    except OSError as e:
+        print(f"Warning: Failed to write tool manifest {manifest_path}: {e}")
+    
+    return tools
+
+
+def auto_discover_tools(tools_dir: Path) -> List[Dict[str, Any]]:
+    """
+    Automatically discover and load tools from the tools directory.
+    
+    This function scans the tools directory for Python files and attempts to
+    automatically register functions as tools based on naming conventions.
+    The scan result is cached in a manifest next to the tools, so later runs
+    only import the modules that actually provide tools.
+    """
+    if not tools_dir.exists():
+        return []
+    
+    # The manifest is fresh while it lists the same modules with the same
+    # modification times; a missing or corrupt one is rebuilt from a scan
+    manifest_path = tools_dir / TOOL_MANIFEST_NAME
+    modules = _module_mtimes(tools_dir)
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        manifest = None
+    if not isinstance(manifest, dict) or manifest.get("modules") != modules:
+        return _build_manifest(tools_dir, modules)
+    
+    tools = []
+    for entry in manifest["tools"]:
+        py_file = str(tools_dir / f"{entry['module']}.py")
+        try:
+            function = getattr(_load_tool_module(py_file), entry["qualname"])
+        except (ImportError, SyntaxError, AttributeError) as e:
+            print(f"Warning: Failed to load tool {entry['name']} from manifest: {e}")
+            continue
+        
+        tool = {
+            "name": entry["name"],
+            "module": entry["module"],
+            "description": entry["doc_first_line"],
+            "function": function
+        }
+        tools.append(tool)
     
     return tools
 
@@ -59,37 +220,37 @@ def load_tools_with_auto_discovery(config: dict, agent_dir: Path) -> List[Dict[s
     additional tools from the tools directory.
     """
     tools = []
+    configured_names = set()
     
     # Load explicitly configured tools first
     if 'tools' in config:
         for tool_config in config['tools']:
+            if not all(key in tool_config for key in _CONFIGURED_TOOL_FIELDS):
+                print(f"Warning: Tool config missing required fields: {tool_config}")
+                continue
+            
+            module_path = tool_module_path(agent_dir, tool_config['module'])
             try:
-                # Import the module dynamically
-                module_name = tool_config['module']
-                module_path = f"{agent_dir.name}.{module_name}"
-                module = importlib.import_module(module_path, package=f"src.agents")
-                
-                # Get the function from the module
-                function_name = tool_config['function']
-                function = getattr(module, function_name)
-                
-                # Create tool definition
-                tool = {
-                    "name": tool_config['name'],
-                    "description": tool_config['description'],
-                    "function": function
-                }
-                tools.append(tool)
-                
-            except Exception as e:
-                print(f"Warning: Failed to load configured tool {tool_config.get('name', 'unknown')}: {e}")
+                # Resolve the function from its module
+                function = cached_import(module_path, tool_config['function'])
+            except (ImportError, AttributeError) as e:
+                print(f"Warning: Failed to load configured tool {tool_config['name']}: {e}")
+                continue
+            
+            # Create tool definition
+            tool = {
+                "name": tool_config['name'],
+                "description": tool_config['description'],
+                "function": function
+            }
+            tools.append(tool)
+            configured_names.add(tool['name'])
     
     # Auto-discover additional tools
     tools_dir = agent_dir / "tools"
     auto_tools = auto_discover_tools(tools_dir)
     
     # Add auto-discovered tools that aren't already configured
-    configured_names = {tool['name'] for tool in tools}
     for auto_tool in auto_tools:
         if auto_tool['name'] not in configured_names:
             tools.append(auto_tool)
@@ -0,0 +1,76 @@
+import os
+from pathlib import Path
+
+from .agent import _BUILTIN_TOOLS, load_agent_config, load_prompt
+from .auto_tool_loader import write_text_atomic
+
+
+FROZEN_MODULE_NAME = "_frozen_agent.py"
+
+
+def generate_frozen_agent(agent_dir: Path = Path(__file__).parent) -> Path:
+    """
+    Generate a module that builds the agent without reading its configuration.
+
+    The generated module hard-codes the resolved config values, the prompt text
+    and the tool imports (made inside build(), so importing the module does not
+    load any tools; a tool that fails to import is skipped with a warning),
+    and records the modification times of the config and
+    prompt files so agent.py can fall back to the dynamic path once they change.
+    """
+    config_path = agent_dir / 'agent_config.yml'
+    config = load_agent_config(config_path)
+    agent_config = config['agent']
+    prompt_path = agent_dir / agent_config['prompt_file']
+
+    # Each custom tool is imported in its own try block so that, like
+    # load_tools_from_config, a tool that fails to load is skipped with a warning
+    tool_lines = []
+    for tool_config in config.get('tools', []):
+        if 'builtin' in tool_config:
+            if tool_config['builtin'] in _BUILTIN_TOOLS:
+                tool_lines += [
+                    f"from google.adk.tools import {tool_config['builtin']}",
+                    f"tools.append({tool_config['builtin']})",
+                ]
+        elif 'module' in tool_config and 'class' in tool_config:
+            tool_name = tool_config.get('name', 'unknown')
+            tool_lines += [
+                "try:",
+                f"    from .{tool_config['module']} import {tool_config['class']}",
+                f"    tools.append({tool_config['class']}())",
+                "except (ImportError, AttributeError) as e:",
+                f"    print(f\"Warning: Failed to load tool {tool_name}: {{e}}\")",
+            ]
+
+    lines = [
+        '"""Generated by codegen.py from agent_config.yml; do not edit."""',
+        "from google.adk import Agent",
+        "",
+        "",
+        f"CONFIG_MTIME_NS = {os.stat(config_path).st_mtime_ns}",
+        f"PROMPT_FILE = {agent_config['prompt_file']!r}",
+        f"PROMPT_MTIME_NS = {os.stat(prompt_path).st_mtime_ns}",
+        f"INSTRUCTION = {load_prompt(prompt_path)!r}",
+        "",
+        "",
+        "def build() -> Agent:",
+        "    tools = []",
+        *(f"    {line}" for line in tool_lines),
+        "    return Agent(",
+        f"        name={agent_config['name']!r},",
+        f"        description={agent_config['description']!r},",
+        f"        model={agent_config['model']!r},",
+        "        instruction=INSTRUCTION,",
+        "        tools=tools",
+        "    )",
+        "",
+    ]
+
+    frozen_path = agent_dir / FROZEN_MODULE_NAME
+    write_text_atomic(frozen_path, "\n".join(lines))
+    return frozen_path
+
+
+if __name__ == "__main__":
+    print(f"Wrote {generate_frozen_agent()}")
@@ -1,11 +1,348 @@
+import ast
+import itertools
+import logging
 import math
+import numbers
 import statistics
-from typing import List, Union, Dict, Any
-import re
+from collections import Counter
+from functools import lru_cache
+from typing import List, Union, Dict, Any, Sequence, Tuple
 from fractions import Fraction
 import cmath
 from google.adk.tools import BaseTool
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; numerical methods fall back to plain Python
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+# Named constants that can be used in expressions
+_CONSTANTS = {
+    'pi': math.pi,
+    'e': math.e,
+    'tau': math.tau,
+    'phi': (1 + math.sqrt(5)) / 2,  # Golden ratio
+}
+
+# Functions that can be called by bare name and resolve to the math module
+_MATH_FUNCTIONS = frozenset({
+    'sin', 'cos', 'tan', 'asin', 'acos', 'atan', 'sqrt', 'exp',
+    'log', 'log10', 'log2', 'floor', 'ceil', 'factorial', 'radians', 'degrees',
+})
+
+# NumPy equivalents of the math functions, used for vectorized evaluation
+_NUMPY_FUNCTIONS = {
+    'sin': 'sin', 'cos': 'cos', 'tan': 'tan', 'asin': 'arcsin', 'acos': 'arccos',
+    'atan': 'arctan', 'sqrt': 'sqrt', 'exp': 'exp', 'log': 'log', 'log10': 'log10',
+    'log2': 'log2', 'floor': 'floor', 'ceil': 'ceil', 'radians': 'radians',
+    'degrees': 'degrees',
+}
+
+# Builtins that can be called from expressions
+_BUILTIN_FUNCTIONS = frozenset({'abs', 'round', 'min', 'max'})
+
+# Restricted globals that compiled expressions are evaluated in
+_EVAL_NAMESPACE = {
+    "math": math,
+    "__builtins__": {},
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+}
+
+# Syntax allowed in a rewritten expression
+_ALLOWED_NODES = (
+    ast.Expression, ast.BinOp, ast.UnaryOp, ast.Call, ast.Name, ast.Attribute,
+    ast.Constant, ast.Load, ast.Add, ast.Sub, ast.Mult, ast.Div, ast.FloorDiv,
+    ast.Mod, ast.Pow, ast.UAdd, ast.USub,
+)
+
+
+class MathRewriter(ast.NodeTransformer):
+    """
+    Rewrite a parsed expression into plain Python math.
+    Folds named constants and maps bare function names onto the math module.
+    """
+    
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id in _CONSTANTS:
+            return ast.copy_location(ast.Constant(_CONSTANTS[node.id]), node)
+        return node
+    
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        self.generic_visit(node)
+        if isinstance(node.func, ast.Name) and node.func.id in _MATH_FUNCTIONS:
+            node.func = ast.copy_location(
+                ast.Attribute(value=ast.Name('math', ast.Load()), attr=node.func.id, ctx=ast.Load()),
+                node.func,
+            )
+        return node
+
+
+class _NumpyRewriter(ast.NodeTransformer):
+    """Map math module calls in a validated expression onto their NumPy ufuncs."""
+    
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        if node.attr not in _NUMPY_FUNCTIONS:
+            raise ValueError(f"No vectorized equivalent for '{node.attr}'")
+        return ast.copy_location(
+            ast.Attribute(value=ast.Name('np', ast.Load()), attr=_NUMPY_FUNCTIONS[node.attr], ctx=ast.Load()),
+            node,
+        )
+    
+    def visit_Call(self, node: ast.Call) -> ast.AST:
+        # round/min/max do not operate elementwise on arrays
+        if isinstance(node.func, ast.Name) and node.func.id != 'abs':
+            raise ValueError(f"No vectorized equivalent for '{node.func.id}'")
+        self.generic_visit(node)
+        return node
+
+
+def _validate_expression(tree: ast.AST, variables: frozenset = frozenset()) -> None:
+    """Reject anything in a rewritten expression that is not plain arithmetic."""
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported syntax in expression: {type(node).__name__}")
+        if isinstance(node, ast.Name):
+            if node.id not in _BUILTIN_FUNCTIONS and node.id not in variables and node.id != 'math':
+                raise ValueError(f"Unknown name in expression: '{node.id}'")
+        elif isinstance(node, ast.Attribute):
+            if not (isinstance(node.value, ast.Name) and node.value.id == 'math'
+                    and (node.attr in _MATH_FUNCTIONS or node.attr in _CONSTANTS)):
+                raise ValueError(f"Unsupported attribute in expression: '{node.attr}'")
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float, complex)):
+                raise ValueError(f"Unsupported constant in expression: {node.value!r}")
+
+
+def _parse_expression(expression: str, variables: frozenset = frozenset()) -> ast.Expression:
+    """Parse, rewrite and validate a mathematical expression."""
+    # Convert common mathematical notation to Python syntax. ^ is replaced
+    # textually so it keeps the precedence of ** rather than of bitwise xor
+    expression = expression.replace('^', '**')  # Convert ^ to ** for exponentiation
+    expression = expression.replace('[', '(')   # Convert [ to ( for grouping
+    expression = expression.replace(']', ')')   # Convert ] to ) for grouping
+    
+    try:
+        tree = ast.parse(expression.strip(), mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {e.msg}")
+    
+    # Plain arithmetic has no names to rewrite, so skip the pass for it
+    if any(c.isalpha() for c in expression):
+        tree = ast.fix_missing_locations(MathRewriter().visit(tree))
+    _validate_expression(tree, variables)
+    return tree
+
+
+@lru_cache(maxsize=256)
+def _compile_expression(expression: str):
+    """Compile an expression to a code object, cached per expression string."""
+    return compile(_parse_expression(expression), '<calc>', 'eval')
+
+
+@lru_cache(maxsize=256)
+def _compile_function(func_str: str):
+    """Compile an expression in x to a Python function f(x), cached per string."""
+    body = _parse_expression(func_str, frozenset({'x'})).body
+    args = ast.arguments(posonlyargs=[], args=[ast.arg('x')], kwonlyargs=[], kw_defaults=[], defaults=[])
+    tree = ast.fix_missing_locations(ast.Expression(ast.Lambda(args=args, body=body)))
+    return eval(compile(tree, '<calc>', 'eval'), _EVAL_NAMESPACE)
+
+
+@lru_cache(maxsize=256)
+def _compile_vectorized_function(func_str: str):
+    """
+    Compile an expression in x to a NumPy function f(xs) over arrays.
+    Returns None when NumPy is unavailable or the expression has no
+    elementwise equivalent.
+    """
+    if np is None:
+        return None
+    
+    body = _parse_expression(func_str, frozenset({'x'})).body
+    try:
+        body = _NumpyRewriter().visit(body)
+    except ValueError:
+        return None
+    
+    args = ast.arguments(posonlyargs=[], args=[ast.arg('x')], kwonlyargs=[], kw_defaults=[], defaults=[])
+    tree = ast.fix_missing_locations(ast.Expression(ast.Lambda(args=args, body=body)))
+    return eval(compile(tree, '<calc>', 'eval'), {"np": np, "__builtins__": {}, "abs": abs})
+
+
+@lru_cache(maxsize=1024)
+def _parse_fraction(value: str) -> Fraction:
+    """Parse a fraction string like '1/2', cached per string."""
+    return Fraction(value)
+
+
+# Degree/radian conversion factors
+_DEG2RAD = math.pi / 180.0
+_RAD2DEG = 180.0 / math.pi
+
+# List sizes above which statistics are computed with NumPy; below them the
+# statistics module's call overhead is lower (mean is already fast for floats)
+_NUMPY_STATS_MIN_SIZE = 64
+_NUMPY_MEAN_MIN_SIZE = 256
+
+
+def _use_numpy_stats(numbers: List[float], min_size: int) -> bool:
+    """
+    Check whether a list should go through NumPy. Only all-float lists do;
+    ints, Fractions and Decimals keep the exact results of the statistics module.
+    """
+    return (
+        np is not None
+        and len(numbers) > min_size
+        and all(type(x) is float for x in numbers)
+    )
+
+# Length units expressed in meters
+_METERS_PER_UNIT = {
+    'mm': 0.001, 'cm': 0.01, 'm': 1, 'km': 1000,
+    'in': 0.0254, 'ft': 0.3048, 'yd': 0.9144, 'mi': 1609.34
+}
+
+# Weight units expressed in grams
+_GRAMS_PER_UNIT = {
+    'mg': 0.001, 'g': 1, 'kg': 1000,
+    'oz': 28.3495, 'lb': 453.592
+}
+
+
+def _unpack_2x2(matrix: Sequence, error: str) -> Tuple[float, float, float, float]:
+    """Unpack a 2x2 matrix given as [[a, b], [c, d]] or (a, b, c, d)."""
+    try:
+        (a, b), (c, d) = matrix
+    except (TypeError, ValueError):
+        try:
+            a, b, c, d = matrix
+        except (TypeError, ValueError):
+            raise ValueError(error)
+        # A flat form must hold the four entries themselves, not rows
+        if not all(isinstance(x, numbers.Number) for x in (a, b, c, d)):
+            raise ValueError(error)
+    return a, b, c, d
+
+
+def _integer_root(x: int, n: int) -> int:
+    """Largest integer r with r ** n <= x, by integer Newton iteration."""
+    if n == 1 or x < 2:
+        return x
+    if n == 2:
+        return math.isqrt(x)
+    # Start above the root and step down until Newton stops decreasing
+    r = 1 << -(-x.bit_length() // n)
+    while True:
+        y = ((n - 1) * r + x // r ** (n - 1)) // n
+        if y >= r:
+            return r
+        r = y
+
+
+# Primes below 1000, tried before any wheel candidates
+_SMALL_PRIMES = tuple(
+    p for p in range(2, 1000) if all(p % q for q in range(2, math.isqrt(p) + 1))
+)
+
+# Gaps between successive numbers coprime to 2, 3 and 5, starting from one
+# that is 11 mod 30. The last small prime, 997, is 7 mod 30, so the wheel
+# starts at 1001
+_WHEEL = (2, 4, 2, 4, 6, 2, 6, 4)
+_WHEEL_START = _SMALL_PRIMES[-1] + 4
+
+# Anything without a factor among the small primes and below this is prime
+_SMALL_PRIMES_SQUARE = 1000 * 1000
+
+# Miller-Rabin with the primes up to 41 as witnesses is exact below this
+_MR_WITNESSES = _SMALL_PRIMES[:13]
+_MR_DETERMINISTIC_LIMIT = 3_317_044_064_679_887_385_961_981
+
+
+def _miller_rabin_round(n: int, a: int) -> bool:
+    """Return False if witness a proves the odd number n composite."""
+    if a % n == 0:
+        return True
+    d = n - 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    x = pow(a, d, n)
+    if x == 1 or x == n - 1:
+        return True
+    for _ in range(s - 1):
+        x = x * x % n
+        if x == n - 1:
+            return True
+    return False
+
+
+def _jacobi(a: int, n: int) -> int:
+    """Jacobi symbol (a/n) for odd positive n."""
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _strong_lucas_test(n: int) -> bool:
+    """
+    Strong Lucas probable-prime test for odd n > 2 with Selfridge's
+    parameters. Together with a base-2 Miller-Rabin round this is the
+    Baillie-PSW test, which has no known counterexample.
+    """
+    if math.isqrt(n) ** 2 == n:
+        return False
+    
+    # First D in 5, -7, 9, -11, ... with (D/n) = -1
+    d_param = 5
+    while True:
+        jacobi = _jacobi(d_param, n)
+        if jacobi == -1:
+            break
+        if jacobi == 0 and abs(d_param) != n:
+            return False
+        d_param = -d_param - 2 if d_param > 0 else -d_param + 2
+    q = (1 - d_param) // 4
+    
+    # n + 1 = d * 2**s with d odd
+    d = n + 1
+    s = (d & -d).bit_length() - 1
+    d >>= s
+    
+    # Compute U_d and V_d (P = 1) by walking the bits of d
+    u, v, qk = 1, 1, q % n
+    for bit in bin(d)[3:]:
+        u = u * v % n
+        v = (v * v - 2 * qk) % n
+        qk = qk * qk % n
+        if bit == '1':
+            u, v = (u + v) % n, (d_param * u + v) % n
+            u = (u + n if u & 1 else u) >> 1
+            v = (v + n if v & 1 else v) >> 1
+            qk = qk * q % n
+    
+    if u == 0 or v == 0:
+        return True
+    for _ in range(s - 1):
+        v = (v * v - 2 * qk) % n
+        qk = qk * qk % n
+        if v == 0:
+            return True
+    return False
+
 
 class AdvancedCalculator:
     """
@@ -14,11 +351,15 @@ class AdvancedCalculator:
     """
     
     def __init__(self):
-        self.constants = {
-            'pi': math.pi,
-            'e': math.e,
-            'tau': math.tau,
-            'phi': (1 + math.sqrt(5)) / 2,  # Golden ratio
+        self.constants = dict(_CONSTANTS)
+        # Conversion factor for every (from_unit, to_unit) pair
+        self._length_ratios = {
+            (u1, u2): _METERS_PER_UNIT[u1] / _METERS_PER_UNIT[u2]
+            for u1 in _METERS_PER_UNIT for u2 in _METERS_PER_UNIT
+        }
+        self._weight_ratios = {
+            (u1, u2): _GRAMS_PER_UNIT[u1] / _GRAMS_PER_UNIT[u2]
+            for u1 in _GRAMS_PER_UNIT for u2 in _GRAMS_PER_UNIT
         }
     
     # Basic Arithmetic Operations
@@ -54,45 +395,55 @@ class AdvancedCalculator:
         """Calculate square root."""
         if x < 0:
             raise ValueError("Cannot calculate square root of negative number")
+        # Perfect squares get an exact integer answer
+        if isinstance(x, int):
+            r = math.isqrt(x)
+            if r * r == x:
+                return r
         return math.sqrt(x)
     
     def nth_root(self, x: float, n: float) -> float:
         """Calculate nth root of x."""
+        # Perfect powers get an exact integer answer instead of e.g. 9.999...
+        if isinstance(x, int) and isinstance(n, int) and n > 0 and x >= 0:
+            r = _integer_root(x, n)
+            if r ** n == x:
+                return r
         return x ** (1/n)
     
     # Trigonometric Functions
     def sin(self, x: float, degrees: bool = False) -> float:
         """Calculate sine (input in radians by default)."""
         if degrees:
-            x = math.radians(x)
+            x = x * _DEG2RAD
         return math.sin(x)
     
     def cos(self, x: float, degrees: bool = False) -> float:
         """Calculate cosine (input in radians by default)."""
         if degrees:
-            x = math.radians(x)
+            x = x * _DEG2RAD
         return math.cos(x)
     
     def tan(self, x: float, degrees: bool = False) -> float:
         """Calculate tangent (input in radians by default)."""
         if degrees:
-            x = math.radians(x)
+            x = x * _DEG2RAD
         return math.tan(x)
     
     def asin(self, x: float, degrees: bool = False) -> float:
         """Calculate arcsine."""
         result = math.asin(x)
-        return math.degrees(result) if degrees else result
+        return result * _RAD2DEG if degrees else result
     
     def acos(self, x: float, degrees: bool = False) -> float:
         """Calculate arccosine."""
         result = math.acos(x)
-        return math.degrees(result) if degrees else result
+        return result * _RAD2DEG if degrees else result
     
     def atan(self, x: float, degrees: bool = False) -> float:
         """Calculate arctangent."""
         result = math.atan(x)
-        return math.degrees(result) if degrees else result
+        return result * _RAD2DEG if degrees else result
     
     # Logarithmic Functions
     def log(self, x: float, base: float = math.e) -> float:
@@ -118,6 +469,8 @@ class AdvancedCalculator:
         """Calculate arithmetic mean."""
         if not numbers:
             raise ValueError("Cannot calculate mean of empty list")
+        if _use_numpy_stats(numbers, _NUMPY_MEAN_MIN_SIZE):
+            return float(np.mean(np.asarray(numbers, dtype=np.float64)))
         return statistics.mean(numbers)
     
     def median(self, numbers: List[float]) -> float:
@@ -130,21 +483,25 @@ class AdvancedCalculator:
         """Calculate mode."""
         if not numbers:
             raise ValueError("Cannot calculate mode of empty list")
-        try:
-            return statistics.mode(numbers)
-        except statistics.StatisticsError:
+        top = Counter(numbers).most_common(2)
+        if len(top) > 1 and top[0][1] == top[1][1]:
             raise ValueError("No unique mode found")
+        return top[0][0]
     
     def standard_deviation(self, numbers: List[float], sample: bool = True) -> float:
         """Calculate standard deviation."""
         if len(numbers) < 2:
             raise ValueError("Need at least 2 numbers for standard deviation")
+        if _use_numpy_stats(numbers, _NUMPY_STATS_MIN_SIZE):
+            return float(np.asarray(numbers, dtype=np.float64).std(ddof=1 if sample else 0))
         return statistics.stdev(numbers) if sample else statistics.pstdev(numbers)
     
     def variance(self, numbers: List[float], sample: bool = True) -> float:
         """Calculate variance."""
         if len(numbers) < 2:
             raise ValueError("Need at least 2 numbers for variance")
+        if _use_numpy_stats(numbers, _NUMPY_STATS_MIN_SIZE):
+            return float(np.asarray(numbers, dtype=np.float64).var(ddof=1 if sample else 0))
         return statistics.variance(numbers) if sample else statistics.pvariance(numbers)
     
     # Advanced Mathematical Functions
@@ -160,20 +517,26 @@ class AdvancedCalculator:
     
     def lcm(self, a: int, b: int) -> int:
         """Calculate least common multiple."""
-        return abs(a * b) // math.gcd(a, b)
+        return math.lcm(a, b)
     
     def is_prime(self, n: int) -> bool:
-        """Check if a number is prime."""
+        """
+        Check if a number is prime.
+        Exact below 3.3e24; larger n are Baillie-PSW probable primes.
+        """
         if n < 2:
             return False
-        if n == 2:
+        for p in _SMALL_PRIMES:
+            if n % p == 0:
+                return n == p
+        if n < _SMALL_PRIMES_SQUARE:
             return True
-        if n % 2 == 0:
+        if not all(_miller_rabin_round(n, a) for a in _MR_WITNESSES):
             return False
-        for i in range(3, int(math.sqrt(n)) + 1, 2):
-            if n % i == 0:
-                return False
-        return True
+        if n < _MR_DETERMINISTIC_LIMIT:
+            return True
+        # Past the proven witness range, finish the Baillie-PSW test
+        return _strong_lucas_test(n)
     
     # Conversion Functions
     def celsius_to_fahrenheit(self, celsius: float) -> float:
@@ -194,7 +557,7 @@ class AdvancedCalculator:
     
     def decimal_to_binary(self, decimal: int) -> str:
         """Convert decimal to binary."""
-        return bin(decimal)[2:]
+        return f"{decimal:b}"
     
     def binary_to_decimal(self, binary: str) -> int:
         """Convert binary to decimal."""
@@ -202,7 +565,7 @@ class AdvancedCalculator:
     
     def decimal_to_hex(self, decimal: int) -> str:
         """Convert decimal to hexadecimal."""
-        return hex(decimal)[2:].upper()
+        return f"{decimal:X}"
     
     def hex_to_decimal(self, hex_str: str) -> int:
         """Convert hexadecimal to decimal."""
@@ -262,40 +625,12 @@ class AdvancedCalculator:
         Safely evaluate mathematical expressions.
         Supports basic operations, functions, and constants.
         """
-        # Replace common mathematical constants
-        expression = expression.replace('pi', str(math.pi))
-        expression = expression.replace('e', str(math.e))
-        
-        # Convert common mathematical notation to Python syntax
-        expression = expression.replace('^', '**')  # Convert ^ to ** for exponentiation
-        expression = expression.replace('[', '(')   # Convert [ to ( for grouping
-        expression = expression.replace(']', ')')   # Convert ] to ) for grouping
-        
-        # Replace functions with math module equivalents
-        expression = re.sub(r'\bsin\(', 'math.sin(', expression)
-        expression = re.sub(r'\bcos\(', 'math.cos(', expression)
-        expression = re.sub(r'\btan\(', 'math.tan(', expression)
-        expression = re.sub(r'\bsqrt\(', 'math.sqrt(', expression)
-        expression = re.sub(r'\blog\(', 'math.log(', expression)
-        expression = re.sub(r'\babs\(', 'abs(', expression)
-        
-        # Safety check - only allow safe operations 
-        # Note: [] and ^ are converted above, so they should be () and ** by now
-        allowed_chars = set('0123456789+-*/().,abcdefghijklmnopqrstuvwxyz_')
-        if not all(c.lower() in allowed_chars or c.isspace() for c in expression):
-            raise ValueError(f"Expression contains invalid characters: '{expression}'")
+        # Parsed, rewritten and validated once per distinct expression
+        code = _compile_expression(expression)
         
         try:
             # Use eval with restricted globals for safety
-            safe_dict = {
-                "math": math,
-                "__builtins__": {},
-                "abs": abs,
-                "round": round,
-                "min": min,
-                "max": max,
-            }
-            result = eval(expression, safe_dict)
+            result = eval(code, _EVAL_NAMESPACE)
             return float(result)
         except Exception as e:
             raise ValueError(f"Invalid expression: {str(e)}")
@@ -316,24 +651,19 @@ class AdvancedCalculator:
     def complex_phase(self, z: complex, degrees: bool = False) -> float:
         """Calculate phase of complex number."""
         result = cmath.phase(z)
-        return math.degrees(result) if degrees else result
+        return result * _RAD2DEG if degrees else result
     
-    # Matrix Operations (for 2x2 matrices represented as lists)
-    def matrix_determinant_2x2(self, matrix: List[List[float]]) -> float:
+    # Matrix Operations (for 2x2 matrices given as nested rows or flat 4-sequences)
+    def matrix_determinant_2x2(self, matrix: Sequence) -> float:
         """Calculate determinant of 2x2 matrix."""
-        if len(matrix) != 2 or len(matrix[0]) != 2 or len(matrix[1]) != 2:
-            raise ValueError("Matrix must be 2x2")
-        return matrix[0][0] * matrix[1][1] - matrix[0][1] * matrix[1][0]
+        a, b, c, d = _unpack_2x2(matrix, "Matrix must be 2x2")
+        return a * d - b * c
     
-    def matrix_add_2x2(self, m1: List[List[float]], m2: List[List[float]]) -> List[List[float]]:
+    def matrix_add_2x2(self, m1: Sequence, m2: Sequence) -> Tuple[Tuple[float, float], Tuple[float, float]]:
         """Add two 2x2 matrices."""
-        if len(m1) != 2 or len(m2) != 2:
-            raise ValueError("Matrices must be 2x2")
-        result = [[0, 0], [0, 0]]
-        for i in range(2):
-            for j in range(2):
-                result[i][j] = m1[i][j] + m2[i][j]
-        return result
+        a, b, c, d = _unpack_2x2(m1, "Matrices must be 2x2")
+        e, f, g, h = _unpack_2x2(m2, "Matrices must be 2x2")
+        return ((a + e, b + f), (c + g, d + h))
     
     # Utility Functions
     def round_to_decimals(self, number: float, decimals: int) -> float:
@@ -363,29 +693,39 @@ class AdvancedCalculator:
         Approximate derivative using finite differences.
         func_str should be a simple function like 'x**2' or 'sin(x)'
         """
-        def evaluate_at(val):
-            expression = func_str.replace('x', str(val))
-            return self.evaluate_expression(expression)
-        
-        return (evaluate_at(x + h) - evaluate_at(x - h)) / (2 * h)
+        f = _compile_function(func_str)
+        try:
+            return float((f(x + h) - f(x - h)) / (2 * h))
+        except Exception as e:
+            raise ValueError(f"Invalid expression: {str(e)}")
     
     def integral_approximation(self, func_str: str, a: float, b: float, n: int = 1000) -> float:
         """
         Approximate definite integral using trapezoidal rule.
         func_str should be a simple function like 'x**2' or 'sin(x)'
         """
-        def evaluate_at(val):
-            expression = func_str.replace('x', str(val))
-            return self.evaluate_expression(expression)
+        # Evaluate all sample points at once when the function vectorizes
+        vectorized = _compile_vectorized_function(func_str)
+        if vectorized is not None:
+            xs = np.linspace(a, b, n + 1)
+            with np.errstate(all='ignore'):
+                ys = np.broadcast_to(vectorized(xs), xs.shape)
+                result = float((ys.sum() - (ys[0] + ys[-1]) / 2) * ((b - a) / n))
+            # Domain errors show up as nan/inf; let the scalar path report them
+            if math.isfinite(result):
+                return result
         
+        f = _compile_function(func_str)
         h = (b - a) / n
-        result = (evaluate_at(a) + evaluate_at(b)) / 2
-        
-        for i in range(1, n):
-            x = a + i * h
-            result += evaluate_at(x)
-        
-        return result * h
+        try:
+            result = (f(a) + f(b)) / 2
+            
+            for i in range(1, n):
+                result += f(a + i * h)
+            
+            return float(result * h)
+        except Exception as e:
+            raise ValueError(f"Invalid expression: {str(e)}")
     
     # Equation Solving (simple cases)
     def solve_quadratic(self, a: float, b: float, c: float) -> Dict[str, Any]:
@@ -398,26 +738,28 @@ class AdvancedCalculator:
                 return {"type": "no_solution" if c != 0 else "infinite_solutions"}
             return {"type": "linear", "solution": -c/b}
         
-        discriminant = b**2 - 4*a*c
+        discriminant = b*b - 4*a*c
+        two_a = 2 * a
         
         if discriminant > 0:
-            x1 = (-b + math.sqrt(discriminant)) / (2*a)
-            x2 = (-b - math.sqrt(discriminant)) / (2*a)
+            sqrt_disc = math.sqrt(discriminant)
+            x1 = (-b + sqrt_disc) / two_a
+            x2 = (-b - sqrt_disc) / two_a
             return {
                 "type": "two_real_solutions",
                 "solutions": [x1, x2],
                 "discriminant": discriminant
             }
         elif discriminant == 0:
-            x = -b / (2*a)
+            x = -b / two_a
             return {
                 "type": "one_real_solution",
                 "solution": x,
                 "discriminant": discriminant
             }
         else:
-            real_part = -b / (2*a)
-            imaginary_part = math.sqrt(-discriminant) / (2*a)
+            real_part = -b / two_a
+            imaginary_part = math.sqrt(-discriminant) / two_a
             return {
                 "type": "complex_solutions",
                 "solutions": [
@@ -434,12 +776,22 @@ class AdvancedCalculator:
             return []
         
         factors = []
-        d = 2
-        while d * d <= n:
-            while n % d == 0:
-                factors.append(d)
-                n //= d
-            d += 1
+        for p in _SMALL_PRIMES:
+            if p * p > n:
+                break
+            while n % p == 0:
+                factors.append(p)
+                n //= p
+        else:
+            # Continue with wheel candidates once the small primes run out
+            d = _WHEEL_START
+            for step in itertools.cycle(_WHEEL):
+                if d * d > n:
+                    break
+                while n % d == 0:
+                    factors.append(d)
+                    n //= d
+                d += step
         if n > 1:
             factors.append(n)
         return factors
@@ -448,64 +800,53 @@ class AdvancedCalculator:
         """Calculate nth Fibonacci number."""
         if n < 0:
             raise ValueError("Fibonacci sequence undefined for negative numbers")
-        if n <= 1:
-            return n
         
+        # Fast doubling over the bits of n, keeping (a, b) = (F(k), F(k+1)):
+        # F(2k) = F(k) * (2F(k+1) - F(k)), F(2k+1) = F(k)^2 + F(k+1)^2
         a, b = 0, 1
-        for _ in range(2, n + 1):
-            a, b = b, a + b
-        return b
+        for bit in bin(n)[2:]:
+            c = a * ((b << 1) - a)
+            d = a * a + b * b
+            if bit == '0':
+                a, b = c, d
+            else:
+                a, b = d, c + d
+        return a
     
     # Unit Conversions
     def convert_length(self, value: float, from_unit: str, to_unit: str) -> float:
         """Convert between length units."""
-        # Convert to meters first
-        to_meters = {
-            'mm': 0.001, 'cm': 0.01, 'm': 1, 'km': 1000,
-            'in': 0.0254, 'ft': 0.3048, 'yd': 0.9144, 'mi': 1609.34
-        }
-        
-        if from_unit not in to_meters or to_unit not in to_meters:
+        try:
+            return value * self._length_ratios[(from_unit, to_unit)]
+        except KeyError:
             raise ValueError("Unsupported unit")
-        
-        meters = value * to_meters[from_unit]
-        return meters / to_meters[to_unit]
     
     def convert_weight(self, value: float, from_unit: str, to_unit: str) -> float:
         """Convert between weight units."""
-        # Convert to grams first
-        to_grams = {
-            'mg': 0.001, 'g': 1, 'kg': 1000,
-            'oz': 28.3495, 'lb': 453.592
-        }
-        
-        if from_unit not in to_grams or to_unit not in to_grams:
+        try:
+            return value * self._weight_ratios[(from_unit, to_unit)]
+        except KeyError:
             raise ValueError("Unsupported unit")
-        
-        grams = value * to_grams[from_unit]
-        return grams / to_grams[to_unit]
     
     # Fraction Operations
     def add_fractions(self, frac1: str, frac2: str) -> str:
         """Add two fractions given as strings like '1/2'."""
-        f1 = Fraction(frac1)
-        f2 = Fraction(frac2)
-        result = f1 + f2
-        return str(result)
+        return str(_parse_fraction(frac1) + _parse_fraction(frac2))
     
     def multiply_fractions(self, frac1: str, frac2: str) -> str:
         """Multiply two fractions given as strings like '1/2'."""
-        f1 = Fraction(frac1)
-        f2 = Fraction(frac2)
-        result = f1 * f2
-        return str(result)
+        return str(_parse_fraction(frac1) * _parse_fraction(frac2))
     
     def simplify_fraction(self, numerator: int, denominator: int) -> str:
         """Simplify a fraction."""
         if denominator == 0:
             raise ValueError("Denominator cannot be zero")
-        frac = Fraction(numerator, denominator)
-        return str(frac)
+        # Reduce by the gcd and keep the sign on the numerator
+        g = math.gcd(numerator, denominator)
+        n, d = numerator // g, denominator // g
+        if d < 0:
+            n, d = -n, -d
+        return f"{n}" if d == 1 else f"{n}/{d}"
 
 
 # Create a global instance for easy access
@@ -554,19 +895,24 @@ class CalculatorTool(BaseTool):
             description="Advanced mathematical calculator for performing calculations including arithmetic, trigonometry, statistics, geometry, algebra, and more."
         )
         self.calc = AdvancedCalculator()
+        # Formatted results of recently evaluated expressions
+        self._evaluate_cached = lru_cache(maxsize=512)(self._evaluate)
+    
+    def _evaluate(self, expression: str) -> str:
+        """Evaluate an expression and format the result for display."""
+        return self.calc.format_result(self.calc.evaluate_expression(expression))
     
     def call(self, expression: str) -> str:
         """Execute a mathematical calculation."""
         try:
             # Log the input for debugging
-            print(f"Calculator tool called with: {expression}")
-            result = self.calc.evaluate_expression(expression)
-            formatted_result = self.calc.format_result(result)
-            print(f"Calculator result: {formatted_result}")
+            logger.debug("Calculator tool called with: %s", expression)
+            formatted_result = self._evaluate_cached(expression)
+            logger.debug("Calculator result: %s", formatted_result)
             return formatted_result
         except Exception as e:
             error_msg = f"Calculator error with '{expression}': {str(e)}"
-            print(error_msg)
+            logger.warning(error_msg)
             return error_msg
 
 